@@ -0,0 +1,66 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Import the web app from the project root
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from webapp import app as webapp
+
+
+class ProcessTraversalTests(unittest.TestCase):
+    """/process must only ever touch the job's own upload inside UPLOAD_DIR"""
+
+    def setUp(self):
+        self.job_id = webapp.build_job_id()
+        self.upload = webapp.UPLOAD_DIR / f"{self.job_id}__list.xlsx"
+        self.upload.write_bytes(b"")
+        self.addCleanup(self.upload.unlink, missing_ok=True)
+
+        webapp.app.config["TESTING"] = True
+        self.client = webapp.app.test_client()
+        start_job = mock.patch.object(webapp, "start_job", return_value="run")
+        self.start_job = start_job.start()
+        self.addCleanup(start_job.stop)
+
+    def post(self, job_id: str, upload_path: str):
+        data = {"job_id": job_id, "upload_path": upload_path, "column": "Name", "limit_mode": "5"}
+        return self.client.post("/process", data=data, follow_redirects=True)
+
+    def assert_rejected(self, job_id: str, upload_path: str):
+        response = self.post(job_id, upload_path)
+        self.assertIn("Upload not found", response.get_data(as_text=True))
+        self.start_job.assert_not_called()
+
+    def test_own_upload_is_accepted(self):
+        self.post(self.job_id, self.upload.name)
+        self.start_job.assert_called_once()
+
+    def test_job_id_traversal_is_rejected(self):
+        # The job id prefixes the upload name and names its Parquet copy; this upload path
+        # still resolves to the real upload, so only the job id check stops it
+        evil = "../../evil"
+        upload_path = f"{evil}__/../{BASE_DIR.name}/uploads/{self.upload.name}"
+        self.assertEqual((webapp.UPLOAD_DIR / upload_path).resolve(), self.upload.resolve())
+        self.assert_rejected(evil, upload_path)
+        self.assertFalse((BASE_DIR.parent / "evil.parquet").exists())
+
+    def test_upload_path_traversal_is_rejected(self):
+        for upload_path in (
+            "../requirements.txt",
+            f"{self.job_id}__/../../requirements.txt",
+            "",
+        ):
+            with self.subTest(upload_path=upload_path):
+                self.assert_rejected(self.job_id, upload_path)
+                self.start_job.reset_mock()
+
+    def test_other_jobs_upload_is_rejected(self):
+        self.assert_rejected(webapp.build_job_id(), self.upload.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
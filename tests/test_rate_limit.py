@@ -0,0 +1,75 @@
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+# Import the core script from the project root
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import trolley_interactive_enhanced_v2 as trolley
+
+
+class _RateLimitedHandler(BaseHTTPRequestHandler):
+    """Answers every request with a 429, echoing ?retry_after= as the Retry-After header"""
+
+    hits = 0
+
+    def do_GET(self):
+        type(self).hits += 1
+        self.send_response(429)
+        if "retry_after=" in self.path:
+            self.send_header("Retry-After", self.path.split("retry_after=")[1].split("&")[0])
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class RateLimitTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _RateLimitedHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _RateLimitedHandler.hits = 0
+        cache = mock.Mock()
+        cache.get.return_value = None
+        for patcher in (
+            mock.patch.object(trolley, "SEARCH_URL", f"http://127.0.0.1:{self.server.server_port}/search/?retry_after=%s"),
+            mock.patch.object(trolley, "SEARCH_CACHE", cache),
+            mock.patch.object(trolley, "_RATE_LIMITER", mock.Mock()),
+            mock.patch.object(trolley.time, "sleep"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def search(self, retry_after: str):
+        trolley.SEARCH_URL %= retry_after
+        return trolley.get_search_results("Heineken 12x330ml")
+
+    def test_long_retry_after_gives_up_without_retrying(self):
+        results, _ = self.search(str(trolley.MAX_RATE_LIMIT_WAIT * 60))
+        self.assertEqual(results, [])
+        self.assertEqual(_RateLimitedHandler.hits, 1)
+        trolley.time.sleep.assert_not_called()
+
+    def test_short_retry_after_is_honoured(self):
+        results, _ = self.search("5")
+        self.assertEqual(results, [])
+        self.assertEqual(_RateLimitedHandler.hits, 3)
+        self.assertEqual([c.args[0] for c in trolley.time.sleep.call_args_list], [5.0, 5.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
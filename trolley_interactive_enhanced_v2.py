@@ -6,17 +6,165 @@ Features: Product matching, CSV export, error handling, logging, quantity detect
 
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
+import diskcache
+from requests.adapters import HTTPAdapter
+import lxml.html
+from lxml import etree
+from cssselect import HTMLTranslator
+import urllib3
 import re
 import time
-import random
-from dataclasses import dataclass
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from dataclasses import dataclass, field
 from typing import List, Optional, Tuple
 import logging
 from datetime import datetime
 import os
+import io
+import csv
+from collections import Counter
 from urllib.parse import urljoin, quote
 
+# Precompiled regex patterns used on the per-SKU / per-product hot paths
+# Size units recognised in SKU names; the patterns below are generated from this vocabulary
+_UNITS = r'(?:ml|l|g|kg|cl|oz|fl\s*oz)'
+_SIZE = rf'(?P<size>\d+(?:\.\d+)?)\s*(?P<unit>{_UNITS})'
+
+# Quantity x size forms, tried in priority order; the first one found anywhere in the name
+# wins. Each has exactly three groups: quantity, size number, size unit
+_SKU_PATTERNS = tuple(
+    re.compile(p, re.IGNORECASE) for p in (
+        rf'(\d+)\s*[xX×]\s*{_SIZE}',  # 15x440ml, 12 x 330ml
+        r'(\d+)\s*[xX×]\s*(\d+(?:\.\d+)?)\s*([a-zA-Z]+)',  # More flexible unit matching
+        rf'(\d+)\s*pack.*?{_SIZE}',  # 15 pack 440ml
+    )
+)
+_SIZE_ONLY = re.compile(_SIZE, re.IGNORECASE)
+# Trailing brand word left over from a size/quantity ("... x", "... 12"), dropped by _clean_brand
+_BRAND_TRAIL_WORDS = frozenset(('x', 'X', '×'))
+# Leading whitespace-separated words that contain no digit (fallback brand)
+_BRAND_HEAD = re.compile(r'(?:[^\s\d]+(?:\s+|$))*')
+_DIGIT_SET = frozenset('0123456789')
+
+_SIZE_PATTERNS = [
+    re.compile(p, re.IGNORECASE) for p in (
+        r'(\d+(?:\.\d+)?\s*(?:ml|l|ML|L|g|kg|oz))',
+        r'(\d+(?:\.\d+)?\s*[a-zA-Z]+)',
+        r'([\d.]+\s*[a-zA-Z]+)',
+    )
+]
+_QTY_NUMBER = re.compile(r'(\d+)')
+# Quantity hints in free text, tried in priority order; each captures the quantity in group 1
+_QTY_PATTERNS = tuple(
+    re.compile(p, re.IGNORECASE) for p in (
+        r'(\d+)\s*[xX×]\s*\d+\s*[a-zA-Z]+',  # 15x440ml
+        r'(\d+)\s*[xX×]',  # 15x
+        r'[xX×]\s*(\d+)',  # x15
+        r'(\d+)\s*pack',  # 15 pack
+        r'pack\s*of\s*(\d+)',  # pack of 15
+    )
+)
+_PRICE = re.compile(r'£[\d.,]+')
+
+_CSS = HTMLTranslator()
+
+def _compile_css(*selectors: str) -> Tuple[etree.XPath, ...]:
+    """Compile CSS selectors once into XPaths yielding the first matching descendant, tried in order"""
+    return tuple(etree.XPath(f"({_CSS.css_to_xpath(s, prefix='descendant::')})[1]") for s in selectors)
+
+# Precompiled search-page selectors, in order of preference per field
+_SEL_PRODUCT_ITEMS = etree.XPath(_CSS.css_to_xpath('div.product-item', prefix='descendant::'))
+_SEL_BRAND = _compile_css('div._brand', '._brand', '[class*="brand"]')
+_SEL_DESC = _compile_css('div._desc', '._desc', '[class*="desc"]', '[class*="title"]')
+_SEL_SIZE = _compile_css('div._size')
+_SEL_SIZE_VALUE = _compile_css('div:not([class])')
+# A _qty inside div._size is also a descendant of the card, so card-level lookups cover it
+_SEL_QTY = _compile_css('div._qty', '._qty')
+_SEL_PRICE = _compile_css('div._price', '._price', '[class*="price"]')
+_SEL_LINK = _compile_css('a[href]')
+
+# Concurrency and politeness settings for the scrape loop
+MAX_WORKERS = 8
+REQUESTS_PER_SECOND = 1.0
+# Longest HTTP 429 back-off honoured before a search is treated as failed
+MAX_RATE_LIMIT_WAIT = 60
+# Keep-alive connections held per host; callers running more threads than this churn sockets
+POOL_CONNECTIONS = 16
+
+SEARCH_URL = "https://www.trolley.co.uk/search/"
+
+_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+# Shared HTTP session - reuses pooled TCP/TLS connections across searches and worker threads
+SESSION = requests.Session()
+SESSION.headers.update(_HEADERS)
+# Failed connects are retried inside the adapter (the server never saw them); HTTP errors
+# and 429s go back to get_search_results so every re-send takes a rate-limiter slot.
+# urllib3 would otherwise treat any response carrying Retry-After as retryable and raise
+# a RetryError without the response, hiding the 429 and its header from that loop
+_ADAPTER = HTTPAdapter(
+    pool_connections=POOL_CONNECTIONS,
+    pool_maxsize=POOL_CONNECTIONS,
+    max_retries=urllib3.util.Retry(
+        total=2, connect=2, read=0, status=0, other=0, backoff_factor=0.5,
+        respect_retry_after_header=False,
+    ),
+)
+SESSION.mount('https://', _ADAPTER)
+SESSION.mount('http://', _ADAPTER)
+
+class RateLimiter:
+    """Thread-safe token bucket that spaces requests evenly across all workers"""
+    
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+    
+    def acquire(self):
+        """Block the calling thread until its request slot comes up"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+_RATE_LIMITER = RateLimiter(REQUESTS_PER_SECOND)
+
+# Persistent cache of parsed search results, so re-runs skip recently fetched searches
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+CACHE_EXPIRE_SECONDS = 24 * 60 * 60
+SEARCH_CACHE = diskcache.Cache(CACHE_DIR)
+
+# Column order of the exported results CSV
+RESULT_FIELDS = [
+    'SKU_Name', 'Parsed_Brand', 'Parsed_Size', 'Parsed_Quantity', 'Search_URL', 'Match_Status',
+    'Matched_Brand', 'Matched_Description', 'Matched_Size', 'Matched_Quantity', 'Matched_Price',
+    'Matched_URL', 'Match_Tier',
+]
+
+# Match tier labels reported by find_best_match
+MATCH_TIERS = {
+    1: "Tier 1 (Perfect)",
+    2: "Tier 2 (Brand+Size)",
+    3: "Tier 3 (Brand Only)",
+    4: "Tier 4 (Fallback)",
+}
+NO_MATCH_TIER = "None"
+
+# Number of streamed CSV rows between explicit flushes to disk
+CSV_FLUSH_EVERY = 100
+
 # Setup logging
 def setup_logging():
     """Setup comprehensive logging with file and console output"""
@@ -32,7 +180,7 @@ def setup_logging():
     )
     logging.info(f"🚀 Enhanced Trolley Scraper started - Log file: {log_filename}")
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SearchResultItem:
     """Representation of a single product from Trolley search results"""
     brand: str
@@ -42,6 +190,22 @@ class SearchResultItem:
     price: str
     url: str
     search_url: str = ""
+    # Lowercased copies used by find_best_match, computed once per item
+    brand_lc: str = field(init=False, repr=False, compare=False)
+    size_lc: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Frozen instances can only set their derived fields through object.__setattr__
+        object.__setattr__(self, 'brand_lc', self.brand.lower())
+        object.__setattr__(self, 'size_lc', self.size.lower())
+
+def _clean_brand(brand: str) -> str:
+    """Drop one trailing 'x'/number word from a parsed brand and collapse its whitespace"""
+    words = brand.split()
+    # The trailing word only counts when whitespace precedes it
+    if words and (len(words) > 1 or brand[:1].isspace()) and (words[-1] in _BRAND_TRAIL_WORDS or words[-1].isdecimal()):
+        words.pop()
+    return ' '.join(words)
 
 def parse_sku_name(sku_name: str) -> Tuple[str, Optional[str], Optional[int]]:
     """
@@ -62,28 +226,26 @@ def parse_sku_name(sku_name: str) -> Tuple[str, Optional[str], Optional[int]]:
     size = None
     brand = ""
     
+    # Every size/quantity pattern needs a digit, so digit-free names are all brand
+    if _DIGIT_SET.isdisjoint(name) and (name.isascii() or not any(map(str.isdecimal, name))):
+        brand = _clean_brand(name)
+        logging.debug(f"📋 Final parsing result: Brand='{brand}', Size='{size}', Quantity={qty}")
+        return brand, size, qty
+    
     # Enhanced patterns for quantity x size matching
-    patterns = [
-        r"(\d+)\s*[xX×]\s*(\d+(?:\.\d+)?)\s*(ml|l|g|kg|cl|oz|fl\s*oz)",  # 15x440ml, 12 x 330ml
-        r"(\d+)\s*[xX×]\s*(\d+(?:\.\d+)?)\s*([a-zA-Z]+)",  # More flexible unit matching
-        r"(\d+)\s*pack.*?(\d+(?:\.\d+)?)\s*(ml|l|g|kg|cl|oz|fl\s*oz)",  # 15 pack 440ml
-    ]
-    
-    qty_size_match = None
-    for pattern in patterns:
-        match = re.search(pattern, name, re.IGNORECASE)
-        if match:
-            qty = int(match.group(1))
-            size_num = match.group(2)
-            size_unit = match.group(3).lower().replace(" ", "")
-            size = f"{size_num}{size_unit}"
-            qty_size_match = match
-            logging.debug(f"✅ Pattern matched: qty={qty}, size={size}")
+    for pattern in _SKU_PATTERNS:
+        qty_size_match = pattern.search(name)
+        if qty_size_match:
             break
+    if qty_size_match:
+        qty_num, size_num, size_unit = qty_size_match.groups()
+        qty = int(qty_num)
+        size = f"{size_num}{size_unit.lower().replace(' ', '')}"
+        logging.debug(f"✅ Pattern matched: qty={qty}, size={size}")
     
     if not size:
         # Look for standalone size (e.g., "440ml", "1.5l")
-        size_match = re.search(r"(\d+(?:\.\d+)?)\s*(ml|l|g|kg|cl|oz|fl\s*oz)", name, re.IGNORECASE)
+        size_match = _SIZE_ONLY.search(name)
         if size_match:
             size = f"{size_match.group(1)}{size_match.group(2).lower().replace(' ', '')}"
             qty = 1  # Default for single items
@@ -95,22 +257,172 @@ def parse_sku_name(sku_name: str) -> Tuple[str, Optional[str], Optional[int]]:
         brand_part = name[:qty_size_match.start()].strip()
         brand = brand_part
     else:
-        # Fallback: take all words before first number
-        tokens = name.split()
-        brand_tokens = []
-        for token in tokens:
-            if re.search(r'\d', token):
-                break
-            brand_tokens.append(token)
-        brand = " ".join(brand_tokens)
+        # Fallback: take all words before the first word containing a number
+        brand = _BRAND_HEAD.match(name).group()
     
     # Clean up brand - remove common trailing words that might be size/quantity related
-    brand = re.sub(r'\s+(x|X|×|\d+)\s*$', '', brand)
-    brand = re.sub(r'\s+', ' ', brand).strip()
+    brand = _clean_brand(brand)
     
     logging.debug(f"📋 Final parsing result: Brand='{brand}', Size='{size}', Quantity={qty}")
     return brand, size, qty
 
+def _select_one(elem, selectors: Tuple[etree.XPath, ...]):
+    """Return the first element under elem matched by the earliest selector that matches, or None"""
+    for selector in selectors:
+        matches = selector(elem)
+        if matches:
+            return matches[0]
+    return None
+
+def _text(elem) -> str:
+    """Concatenate an element's stripped text fragments (like BeautifulSoup's get_text(strip=True))"""
+    return "".join(fragment.strip() for fragment in elem.itertext())
+
+def parse_search_results(source, search_url: str = "", encoding: Optional[str] = None) -> List[SearchResultItem]:
+    """
+    Parse product cards from a Trolley.co.uk search results page
+    
+    :param source: Raw HTML bytes, or a file-like object to stream the page from
+    :param search_url: Search URL to record on each result
+    :param encoding: Charset declared by the HTTP response; None lets lxml go by the page's <meta charset>
+    :return: List of SearchResultItem objects
+    """
+    if isinstance(source, str):
+        source, encoding = source.encode('utf-8'), 'utf-8'
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    parser = lxml.html.HTMLParser(encoding=encoding) if encoding else None
+    root = lxml.html.parse(source, parser).getroot()
+    
+    # Parse search results with comprehensive logic
+    results = []
+    
+    product_items = _SEL_PRODUCT_ITEMS(root) if root is not None else []
+    
+    if not product_items:
+        logging.warning("❌ No product items found in search results")
+        return []
+    
+    logging.info(f"📦 Processing {len(product_items)} product items")
+    
+    for i, item in enumerate(product_items, 1):
+        try:
+            # More comprehensive brand extraction
+            brand = "Unknown"
+            brand_elem = _select_one(item, _SEL_BRAND)
+            if brand_elem is not None:
+                brand = _text(brand_elem)
+            
+            # More comprehensive description extraction
+            description = "No description"
+            desc_elem = _select_one(item, _SEL_DESC)
+            if desc_elem is not None:
+                description = _text(desc_elem)
+            
+            # Comprehensive size extraction
+            size = "Unknown"
+            size_text = ""
+            
+            # Try multiple approaches to find size
+            size_elem = _select_one(item, _SEL_SIZE)
+            if size_elem is not None:
+                # Get all text from size element and its children
+                size_text = _text(size_elem)
+                
+                # Try to find size in a nested div
+                size_div = _select_one(size_elem, _SEL_SIZE_VALUE)
+                if size_div is not None:
+                    size_text = _text(size_div)
+            
+            # Extract size with multiple patterns
+            if size_text:
+                for pattern in _SIZE_PATTERNS:
+                    size_match = pattern.search(size_text)
+                    if size_match:
+                        size = size_match.group(1).lower().replace(' ', '')
+                        break
+                
+                if size == "Unknown":
+                    size = size_text[:20]  # Fallback to first 20 chars
+            
+            # Comprehensive quantity extraction
+            quantity = "1"  # Default
+            
+            for selector in _SEL_QTY:
+                qty_elems = selector(item)
+                # Extract first number from quantity text
+                qty_match = _QTY_NUMBER.search(_text(qty_elems[0])) if qty_elems else None
+                if qty_match:
+                    quantity = qty_match.group(1)
+                    break
+            else:
+                # No quantity element: look for patterns like "15x", "12 x" in the description
+                # and size text, rather than walking the whole card for its full text
+                qty_text = f"{description} {size_text}"
+                for pattern in _QTY_PATTERNS:
+                    qty_match = pattern.search(qty_text)
+                    # Only use if it's a reasonable quantity (1-100)
+                    if qty_match and 1 <= int(qty_match.group(1)) <= 100:
+                        quantity = qty_match.group(1)
+                        break
+            
+            # Comprehensive price extraction
+            price = "Unknown"
+            for selector in _SEL_PRICE:
+                price_elems = selector(item)
+                if price_elems:
+                    price_text = _text(price_elems[0])
+                    price_match = _PRICE.search(price_text)
+                    if price_match:
+                        price = price_match.group()
+                        break
+            
+            # Comprehensive URL extraction
+            url = ""
+            link_elem = _select_one(item, _SEL_LINK)
+            if link_elem is not None:
+                href = link_elem.get('href')
+                if href:
+                    url = urljoin("https://www.trolley.co.uk", href)
+            
+            # Create result item with search URL
+            result = SearchResultItem(
+                brand=brand,
+                description=description,
+                size=size,
+                quantity=quantity,
+                price=price,
+                url=url,
+                search_url=search_url
+            )
+            
+            results.append(result)
+            logging.debug(f"📄 Product {i}: {brand} | {description} | {size} | x{quantity} | {price} | {url}")
+            
+        except Exception as e:
+            logging.warning(f"⚠️ Error parsing product item {i}: {e}")
+            continue
+    
+    return results
+
+def _rate_limit_wait(response: requests.Response, attempt: int) -> Optional[float]:
+    """
+    Seconds to back off after an HTTP 429, from the server's reset header or exponential backoff
+    
+    :return: The wait, or None if the server asks for longer than MAX_RATE_LIMIT_WAIT
+    """
+    reset = response.headers.get('Retry-After') or response.headers.get('X-RateLimit-Reset')
+    try:
+        wait_time = float(reset)
+    except (TypeError, ValueError):
+        return 2 ** (attempt + 1)
+    # X-RateLimit-Reset is sometimes an epoch timestamp rather than a delay
+    if wait_time > time.time() / 2:
+        wait_time -= time.time()
+    if wait_time > MAX_RATE_LIMIT_WAIT:
+        return None
+    return max(wait_time, 2 ** (attempt + 1))
+
 def get_search_results(search_term: str, max_retries: int = 3) -> Tuple[List[SearchResultItem], str]:
     """
     Get search results from Trolley.co.uk with comprehensive HTML parsing
@@ -119,207 +431,70 @@ def get_search_results(search_term: str, max_retries: int = 3) -> Tuple[List[Sea
     :param max_retries: Maximum number of retry attempts
     :return: Tuple of (List of SearchResultItem objects, search_url)
     """
-    base_url = "https://www.trolley.co.uk/search/"
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-    }
+    cached = SEARCH_CACHE.get(search_term)
+    if cached is not None:
+        logging.info(f"💾 Using cached search results for: {search_term}")
+        return cached
     
     params = {
         'from': 'search',
         'q': search_term
     }
     
-    # Construct search URL
-    search_url = f"{base_url}?from=search&q={quote(search_term)}"
+    # Taken from the response (final URL after redirects); only built by hand if no request completes
+    search_url = None
     
     for attempt in range(max_retries):
         try:
             logging.info(f"🔍 Searching for: {search_term} (attempt {attempt + 1})")
-            logging.info(f"🌐 Search URL: {search_url}")
-            
-            response = requests.get(base_url, params=params, headers=headers, timeout=15)
-            response.raise_for_status()
-            
-            # Save the complete HTML for debugging
-            html_debug_file = f"search_debug_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-            with open(html_debug_file, 'w', encoding='utf-8') as f:
-                f.write(response.text)
-            logging.debug(f"💾 Saved search HTML to: {html_debug_file}")
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Parse search results with comprehensive logic
-            results = []
-            
-            # Try multiple selectors to find product items
-            product_selectors = [
-                'div.product-item',
-                'section#search-results div.product-item',
-                '.product-item',
-                '[class*="product"]'
-            ]
             
-            product_items = []
-            for selector in product_selectors:
-                product_items = soup.select(selector)
-                if product_items:
-                    logging.info(f"✅ Found {len(product_items)} items using selector: {selector}")
-                    break
-            
-            if not product_items:
-                logging.warning("❌ No product items found with any selector")
-                return [], search_url
-            
-            logging.info(f"📦 Processing {len(product_items)} product items")
-            
-            for i, item in enumerate(product_items, 1):
-                try:
-                    # More comprehensive brand extraction
-                    brand = "Unknown"
-                    brand_selectors = ['div._brand', '._brand', '[class*="brand"]']
-                    for selector in brand_selectors:
-                        brand_elem = item.select_one(selector)
-                        if brand_elem:
-                            brand = brand_elem.get_text(strip=True)
-                            break
-                    
-                    # More comprehensive description extraction
-                    description = "No description"
-                    desc_selectors = ['div._desc', '._desc', '[class*="desc"]', '[class*="title"]']
-                    for selector in desc_selectors:
-                        desc_elem = item.select_one(selector)
-                        if desc_elem:
-                            description = desc_elem.get_text(strip=True)
-                            break
-                    
-                    # Comprehensive size extraction
-                    size = "Unknown"
-                    size_text = ""
-                    
-                    # Try multiple approaches to find size
-                    size_elem = item.select_one('div._size')
-                    if size_elem:
-                        # Get all text from size element and its children
-                        size_text = size_elem.get_text(strip=True)
-                        
-                        # Try to find size in a nested div
-                        size_div = size_elem.select_one('div:not([class])')
-                        if size_div:
-                            size_text = size_div.get_text(strip=True)
-                    
-                    # Extract size with multiple patterns
-                    if size_text:
-                        size_patterns = [
-                            r'(\d+(?:\.\d+)?\s*(?:ml|l|ML|L|g|kg|oz))',
-                            r'(\d+(?:\.\d+)?\s*[a-zA-Z]+)',
-                            r'([\d.]+\s*[a-zA-Z]+)'
-                        ]
-                        
-                        for pattern in size_patterns:
-                            size_match = re.search(pattern, size_text, re.IGNORECASE)
-                            if size_match:
-                                size = size_match.group(1).lower().replace(' ', '')
-                                break
-                        
-                        if size == "Unknown":
-                            size = size_text[:20]  # Fallback to first 20 chars
-                    
-                    # Comprehensive quantity extraction
-                    quantity = "1"  # Default
-                    
-                    # Look for quantity in multiple places
-                    qty_sources = [
-                        item.select_one('div._qty'),
-                        item.select_one('._qty'),
-                        size_elem.select_one('._qty') if size_elem else None,
-                        size_elem.select_one('div._qty') if size_elem else None
-                    ]
-                    
-                    for qty_elem in qty_sources:
-                        if qty_elem:
-                            qty_text = qty_elem.get_text(strip=True)
-                            # Extract first number from quantity text
-                            qty_match = re.search(r'(\d+)', qty_text)
-                            if qty_match:
-                                quantity = qty_match.group(1)
-                                break
-                    
-                    # Also check the full item text for quantity patterns like "15x", "12 x"
-                    full_text = item.get_text()
-                    qty_patterns = [
-                        r'(\d+)\s*[xX×]\s*\d+\s*[a-zA-Z]+',  # 15x440ml
-                        r'(\d+)\s*[xX×]',  # 15x
-                        r'[xX×]\s*(\d+)',  # x15
-                        r'(\d+)\s*pack',  # 15 pack
-                        r'pack\s*of\s*(\d+)',  # pack of 15
-                    ]
-                    
-                    for pattern in qty_patterns:
-                        qty_match = re.search(pattern, full_text, re.IGNORECASE)
-                        if qty_match:
-                            potential_qty = qty_match.group(1)
-                            # Only use if it's a reasonable quantity (1-100)
-                            if 1 <= int(potential_qty) <= 100:
-                                quantity = potential_qty
-                                break
-                    
-                    # Comprehensive price extraction
-                    price = "Unknown"
-                    price_selectors = ['div._price', '._price', '[class*="price"]']
-                    for selector in price_selectors:
-                        price_elem = item.select_one(selector)
-                        if price_elem:
-                            price_text = price_elem.get_text(strip=True)
-                            price_match = re.search(r'£[\d.,]+', price_text)
-                            if price_match:
-                                price = price_match.group()
-                                break
-                    
-                    # Comprehensive URL extraction
-                    url = ""
-                    link_elem = item.select_one('a[href]')
-                    if link_elem:
-                        href = link_elem.get('href')
-                        if href:
-                            url = urljoin("https://www.trolley.co.uk", href)
-                    
-                    # Create result item with search URL
-                    result = SearchResultItem(
-                        brand=brand,
-                        description=description,
-                        size=size,
-                        quantity=quantity,
-                        price=price,
-                        url=url,
-                        search_url=search_url
-                    )
-                    
-                    results.append(result)
-                    logging.debug(f"📄 Product {i}: {brand} | {description} | {size} | x{quantity} | {price} | {url}")
-                    
-                except Exception as e:
-                    logging.warning(f"⚠️ Error parsing product item {i}: {e}")
-                    continue
+            # Every outgoing request (retries included) draws from the one global budget; cache hits don't
+            _RATE_LIMITER.acquire()
+            with SESSION.get(SEARCH_URL, params=params, timeout=15, stream=True) as response:
+                search_url = response.url
+                logging.info(f"🌐 Search URL: {search_url}")
+                response.raise_for_status()
+                # Only a charset the server states: requests assumes ISO-8859-1 for text/* without
+                # one, which would override the page's own <meta charset>
+                content_type = response.headers.get('Content-Type', '').lower()
+                encoding = response.encoding if 'charset=' in content_type else None
+                
+                if logging.getLogger().isEnabledFor(logging.DEBUG):
+                    # Save the complete HTML for debugging
+                    html_debug_file = f"search_debug_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
+                    with open(html_debug_file, 'w', encoding='utf-8') as f:
+                        f.write(response.text)
+                    logging.debug(f"💾 Saved search HTML to: {html_debug_file}")
+                    results = parse_search_results(response.content, search_url, encoding)
+                else:
+                    # Feed the (decompressed) body straight into lxml without buffering it
+                    response.raw.decode_content = True
+                    results = parse_search_results(response.raw, search_url, encoding)
             
             if results:
                 logging.info(f"✅ Successfully parsed {len(results)} products")
                 # Log detailed results for debugging
                 for i, result in enumerate(results[:5], 1):
                     logging.info(f"  {i}. {result.brand} {result.description} {result.size} x{result.quantity} - {result.price}")
+                SEARCH_CACHE.set(search_term, (results, search_url), expire=CACHE_EXPIRE_SECONDS)
                 return results, search_url
-            else:
-                logging.warning("❌ No products found in search results")
-                
-        except requests.RequestException as e:
+            
+            # A page without product cards won't change on a re-fetch
+            logging.warning("❌ No products found in search results")
+            return [], search_url
+            
+        except (requests.RequestException, urllib3.exceptions.HTTPError) as e:
             logging.error(f"🌐 Request failed (attempt {attempt + 1}): {e}")
             if attempt < max_retries - 1:
-                wait_time = (attempt + 1) * 2
+                response = getattr(e, 'response', None)
+                if response is not None and response.status_code == 429:
+                    wait_time = _rate_limit_wait(response, attempt)
+                    if wait_time is None:
+                        # Don't park a worker for an hour-long rate-limit window; count it as failed
+                        logging.error(f"🚦 Rate limited beyond {MAX_RATE_LIMIT_WAIT}s, giving up on: {search_term}")
+                        break
+                else:
+                    wait_time = (attempt + 1) * 2
                 logging.info(f"⏳ Retrying in {wait_time} seconds...")
                 time.sleep(wait_time)
         except Exception as e:
@@ -327,16 +502,33 @@ def get_search_results(search_term: str, max_retries: int = 3) -> Tuple[List[Sea
             break
     
     logging.error(f"❌ Failed to get search results after {max_retries} attempts")
-    return [], search_url
+    return [], search_url or f"{SEARCH_URL}?from=search&q={quote(search_term)}"
+
+def _brand_matches(item_lower: str, expected_lower: str, expected_words: Tuple[str, ...]) -> bool:
+    """
+    Flexible brand check between two lowercased brand strings
+    
+    :param item_lower: Candidate's lowercased brand
+    :param expected_lower: Lowercased expected brand ("" matches everything)
+    :param expected_words: Words of the expected brand longer than 3 characters
+    :return: True if the brands match in either direction or share a word
+    """
+    if not expected_lower:
+        return True
+    # Check if expected brand contains item brand OR item brand contains expected brand
+    return (expected_lower in item_lower or
+            item_lower in expected_lower or
+            # Also check for partial word matches
+            any(word in item_lower for word in expected_words))
 
 def find_best_match(
     expected_brand: str,
     expected_size: Optional[str],
     expected_qty: Optional[int],
     candidates: List[SearchResultItem],
-) -> Optional[SearchResultItem]:
+) -> Tuple[Optional[SearchResultItem], str]:
     """
-    Return the candidate that best matches the expected attributes.
+    Return the candidate that best matches the expected attributes, with its match tier.
     
     Enhanced matching logic with multi-tier strategy:
     1. Exact match: brand + size + quantity
@@ -348,11 +540,11 @@ def find_best_match(
     :param expected_size: Parsed size from SKU name (e.g., '440ml')
     :param expected_qty: Parsed quantity from SKU name (e.g., 15)
     :param candidates: List of SearchResultItem objects from search results
-    :return: Matched SearchResultItem or None
+    :return: Tuple of (matched SearchResultItem or None, match tier label)
     """
     if not candidates:
         logging.warning("❌ No candidates provided for matching")
-        return None
+        return None, NO_MATCH_TIER
     
     # Convert expected quantity to string for comparison
     expected_qty_str = str(expected_qty) if expected_qty else ""
@@ -360,78 +552,149 @@ def find_best_match(
     logging.info(f"🎯 Looking for: Brand='{expected_brand}', Size='{expected_size}', Quantity='{expected_qty_str}'")
     logging.info(f"📝 Checking {len(candidates)} candidates...")
     
-    # Tier 1: Exact match (brand + size + quantity)
-    logging.info("🔍 Tier 1: Checking for exact matches (brand + size + quantity)...")
+    # Lowercase the expected attributes once rather than per candidate and tier
+    expected_lower = expected_brand.lower() if expected_brand else ""
+    expected_words = tuple(word for word in expected_lower.split() if len(word) > 3)
+    expected_size_lc = expected_size.lower() if expected_size else None
+    
+    # Single pass: remember the best tier seen so far, stop at the first perfect match
+    best_match = None
+    best_tier = 4
+    # Search pages repeat the same brand across many cards - check each distinct brand once
+    brand_hits = {}
+    # The per-candidate trace formats four f-strings; only build them when they'll be emitted
+    debug = logging.getLogger().isEnabledFor(logging.DEBUG)
     for i, item in enumerate(candidates, 1):
-        # More flexible brand matching - check both directions
-        brand_match = False
-        if expected_brand:
-            # Check if expected brand contains item brand OR item brand contains expected brand
-            expected_lower = expected_brand.lower()
-            item_lower = item.brand.lower()
-            brand_match = (expected_lower in item_lower or 
-                          item_lower in expected_lower or
-                          # Also check for partial word matches
-                          any(word in item_lower for word in expected_lower.split() if len(word) > 3))
-        else:
-            brand_match = True
-            
-        size_match = expected_size.lower() in item.size.lower() if expected_size else True
+        brand_match = brand_hits.get(item.brand_lc)
+        if brand_match is None:
+            brand_match = brand_hits[item.brand_lc] = _brand_matches(item.brand_lc, expected_lower, expected_words)
+        size_match = expected_size_lc in item.size_lc if expected_size_lc else True
         qty_match = expected_qty_str == item.quantity if expected_qty_str else True
         
-        logging.debug(f"  Candidate {i}: {item.brand} {item.description} {item.size} x{item.quantity}")
-        logging.debug(f"    Expected: brand='{expected_brand}', size='{expected_size}', qty='{expected_qty_str}'")
-        logging.debug(f"    Found: brand='{item.brand}', size='{item.size}', qty='{item.quantity}'")
-        logging.debug(f"    Matches: brand={brand_match}, size={size_match}, qty={qty_match}")
+        if debug:
+            logging.debug(f"  Candidate {i}: {item.brand} {item.description} {item.size} x{item.quantity}")
+            logging.debug(f"    Expected: brand='{expected_brand}', size='{expected_size}', qty='{expected_qty_str}'")
+            logging.debug(f"    Found: brand='{item.brand}', size='{item.size}', qty='{item.quantity}'")
+            logging.debug(f"    Matches: brand={brand_match}, size={size_match}, qty={qty_match}")
         
-        if brand_match and size_match and qty_match:
-            logging.info(f"🎉 Tier 1 PERFECT MATCH found: {item.brand} {item.description} {item.size} x{item.quantity}")
-            logging.info(f"✅ Verification: Brand(✓) + Size(✓) + Quantity(✓) - Price: {item.price}")
-            return item
-    
-    # Tier 2: Brand + size match
-    logging.info("🔍 Tier 2: Checking for brand + size matches...")
-    for i, item in enumerate(candidates, 1):
-        # More flexible brand matching
-        brand_match = False
-        if expected_brand:
-            expected_lower = expected_brand.lower()
-            item_lower = item.brand.lower()
-            brand_match = (expected_lower in item_lower or 
-                          item_lower in expected_lower or
-                          any(word in item_lower for word in expected_lower.split() if len(word) > 3))
-        else:
-            brand_match = True
-            
-        size_match = expected_size.lower() in item.size.lower() if expected_size else True
+        if not brand_match:
+            continue
         
-        if brand_match and size_match:
-            logging.info(f"✅ Tier 2 match found: {item.brand} {item.description} {item.size} (quantity differs)")
-            return item
-    
-    # Tier 3: Brand match only
-    logging.info("🔍 Tier 3: Checking for brand-only matches...")
-    for item in candidates:
-        # More flexible brand matching
-        brand_match = False
-        if expected_brand:
-            expected_lower = expected_brand.lower()
-            item_lower = item.brand.lower()
-            brand_match = (expected_lower in item_lower or 
-                          item_lower in expected_lower or
-                          any(word in item_lower for word in expected_lower.split() if len(word) > 3))
-        else:
-            brand_match = True
-            
-        if brand_match:
-            logging.info(f"⚠️ Tier 3 match found: {item.brand} {item.description} (size/quantity differ)")
-            return item
+        # Tier 1: brand + size + quantity, Tier 2: brand + size, Tier 3: brand only
+        tier = 1 if size_match and qty_match else 2 if size_match else 3
+        if tier < best_tier:
+            best_match, best_tier = item, tier
+            if tier == 1:
+                break
+    
+    if best_tier == 1:
+        logging.info(f"🎉 Tier 1 PERFECT MATCH found: {best_match.brand} {best_match.description} {best_match.size} x{best_match.quantity}")
+        logging.info(f"✅ Verification: Brand(✓) + Size(✓) + Quantity(✓) - Price: {best_match.price}")
+        return best_match, MATCH_TIERS[1]
+    if best_tier == 2:
+        logging.info(f"✅ Tier 2 match found: {best_match.brand} {best_match.description} {best_match.size} (quantity differs)")
+        return best_match, MATCH_TIERS[2]
+    if best_tier == 3:
+        logging.info(f"⚠️ Tier 3 match found: {best_match.brand} {best_match.description} (size/quantity differ)")
+        return best_match, MATCH_TIERS[3]
     
     # Tier 4: Fallback to first result
     logging.warning("⚠️ No good matches found, using first result as fallback")
     first_item = candidates[0]
     logging.info(f"📌 Fallback: {first_item.brand} {first_item.description} {first_item.size} x{first_item.quantity}")
-    return first_item
+    return first_item, MATCH_TIERS[4]
+
+def _process_one(
+    product_name: str,
+    parsed_sku: Tuple[str, Optional[str], Optional[int]],
+    current_product: int,
+    total_products: int,
+) -> dict:
+    """
+    Search, match and build the result row for a single product name
+    
+    :param product_name: Product name from the Excel column
+    :param parsed_sku: (brand, size, quantity) as returned by parse_sku_name
+    :param current_product: 1-based position of the product, for progress output
+    :param total_products: Total number of products being processed
+    :return: Result row for the CSV export
+    """
+    print(f"\n{'='*60}")
+    print(f"🔄 Processing {current_product}/{total_products}: {product_name}")
+    print('='*60)
+    logging.info(f"Processing {current_product}/{total_products}: {product_name}")
+    
+    brand, size, quantity = parsed_sku
+    print(f"📄 Parsed - Brand: '{brand}', Size: '{size}', Quantity: {quantity}")
+    logging.info(f"Parsed - Brand: '{brand}', Size: '{size}', Quantity: {quantity}")
+    
+    # Get search results
+    search_results, search_url = get_search_results(product_name)
+    
+    if not search_results:
+        print("❌ No search results found")
+        return {
+            'SKU_Name': product_name,
+            'Parsed_Brand': brand,
+            'Parsed_Size': size,
+            'Parsed_Quantity': quantity,
+            'Search_URL': search_url,
+            'Match_Status': 'No Results',
+            'Matched_Brand': 'N/A',
+            'Matched_Description': 'N/A',
+            'Matched_Size': 'N/A',
+            'Matched_Quantity': 'N/A',
+            'Matched_Price': 'N/A',
+            'Matched_URL': 'N/A',
+            'Match_Tier': NO_MATCH_TIER
+        }
+    
+    print(f"🎯 Found {len(search_results)} search results")
+    
+    # Find best match
+    best_match, match_tier = find_best_match(brand, size, quantity, search_results)
+    
+    if best_match:
+        print(f"✅ Best match found ({match_tier}):")
+        print(f"   Brand: {best_match.brand}")
+        print(f"   Description: {best_match.description}")
+        print(f"   Size: {best_match.size}")
+        print(f"   Quantity: {best_match.quantity}")
+        print(f"   Price: {best_match.price}")
+        print(f"   URL: {best_match.url}")
+        
+        return {
+            'SKU_Name': product_name,
+            'Parsed_Brand': brand,
+            'Parsed_Size': size,
+            'Parsed_Quantity': quantity,
+            'Search_URL': search_url,
+            'Match_Status': 'Matched',
+            'Matched_Brand': best_match.brand,
+            'Matched_Description': best_match.description,
+            'Matched_Size': best_match.size,
+            'Matched_Quantity': best_match.quantity,
+            'Matched_Price': best_match.price,
+            'Matched_URL': best_match.url,
+            'Match_Tier': match_tier
+        }
+    
+    print("❌ No suitable match found")
+    return {
+        'SKU_Name': product_name,
+        'Parsed_Brand': brand,
+        'Parsed_Size': size,
+        'Parsed_Quantity': quantity,
+        'Search_URL': search_url,
+        'Match_Status': 'No Match',
+        'Matched_Brand': 'N/A',
+        'Matched_Description': 'N/A',
+        'Matched_Size': 'N/A',
+        'Matched_Quantity': 'N/A',
+        'Matched_Price': 'N/A',
+        'Matched_URL': 'N/A',
+        'Match_Tier': NO_MATCH_TIER
+    }
 
 def process_products(file_path: str, column_name: str, limit: int = None):
     """
@@ -454,137 +717,55 @@ def process_products(file_path: str, column_name: str, limit: int = None):
             raise ValueError(f"Column '{column_name}' not found in Excel file. Available columns: {list(df.columns)}")
         
         # Prepare results
-        results = []
         total_products = min(len(df), limit) if limit else len(df)
-        current_product = 0
         
-        print(f"🎯 Processing {total_products} products...")
+        # Clean the product column in one vectorized pass instead of building a Series per row
+        names = df[column_name].head(limit)
+        stripped = names.astype(str).str.strip()
+        keep = names.notna().to_numpy() & (stripped != '').to_numpy()
+        for index in names.index[~keep]:
+            logging.warning(f"Empty product name at row {index + 1}, skipping")
+        product_names = stripped.to_numpy(dtype=object)[keep]
         
-        for index, row in df.head(limit).iterrows():
-            product_name = row[column_name].strip()
-            
-            if not product_name or pd.isna(product_name):
-                logging.warning(f"Empty product name at row {index + 1}, skipping")
-                continue
-            
-            current_product += 1
-            print(f"\n{'='*60}")
-            print(f"🔄 Processing {current_product}/{total_products}: {product_name}")
-            print('='*60)
-            logging.info(f"Processing {current_product}/{total_products}: {product_name}")
-            
-            # Parse SKU name for better matching
-            brand, size, quantity = parse_sku_name(product_name)
-            print(f"📄 Parsed - Brand: '{brand}', Size: '{size}', Quantity: {quantity}")
-            logging.info(f"Parsed - Brand: '{brand}', Size: '{size}', Quantity: {quantity}")
-            
-            # Get search results
-            search_results, search_url = get_search_results(product_name)
-            
-            if not search_results:
-                print("❌ No search results found")
-                result_data = {
-                    'SKU_Name': product_name,
-                    'Parsed_Brand': brand,
-                    'Parsed_Size': size,
-                    'Parsed_Quantity': quantity,
-                    'Search_URL': search_url,
-                    'Match_Status': 'No Results',
-                    'Matched_Brand': 'N/A',
-                    'Matched_Description': 'N/A',
-                    'Matched_Size': 'N/A',
-                    'Matched_Quantity': 'N/A',
-                    'Matched_Price': 'N/A',
-                    'Matched_URL': 'N/A',
-                    'Match_Tier': 'None'
-                }
-                results.append(result_data)
-                continue
-            
-            print(f"🎯 Found {len(search_results)} search results")
-            
-            # Find best match
-            best_match = find_best_match(brand, size, quantity, search_results)
-            
-            if best_match:
-                # Determine match tier for reporting
-                brand_match = brand.lower() in best_match.brand.lower() if brand else True
-                size_match = size.lower() in best_match.size.lower() if size else True
-                qty_match = str(quantity) == best_match.quantity if quantity else True
-                
-                if brand_match and size_match and qty_match:
-                    match_tier = "Tier 1 (Perfect)"
-                elif brand_match and size_match:
-                    match_tier = "Tier 2 (Brand+Size)"
-                elif brand_match:
-                    match_tier = "Tier 3 (Brand Only)"
-                else:
-                    match_tier = "Tier 4 (Fallback)"
-                
-                print(f"✅ Best match found ({match_tier}):")
-                print(f"   Brand: {best_match.brand}")
-                print(f"   Description: {best_match.description}")
-                print(f"   Size: {best_match.size}")
-                print(f"   Quantity: {best_match.quantity}")
-                print(f"   Price: {best_match.price}")
-                print(f"   URL: {best_match.url}")
-                
-                result_data = {
-                    'SKU_Name': product_name,
-                    'Parsed_Brand': brand,
-                    'Parsed_Size': size,
-                    'Parsed_Quantity': quantity,
-                    'Search_URL': search_url,
-                    'Match_Status': 'Matched',
-                    'Matched_Brand': best_match.brand,
-                    'Matched_Description': best_match.description,
-                    'Matched_Size': best_match.size,
-                    'Matched_Quantity': best_match.quantity,
-                    'Matched_Price': best_match.price,
-                    'Matched_URL': best_match.url,
-                    'Match_Tier': match_tier
-                }
-            else:
-                print("❌ No suitable match found")
-                result_data = {
-                    'SKU_Name': product_name,
-                    'Parsed_Brand': brand,
-                    'Parsed_Size': size,
-                    'Parsed_Quantity': quantity,
-                    'Search_URL': search_url,
-                    'Match_Status': 'No Match',
-                    'Matched_Brand': 'N/A',
-                    'Matched_Description': 'N/A',
-                    'Matched_Size': 'N/A',
-                    'Matched_Quantity': 'N/A',
-                    'Matched_Price': 'N/A',
-                    'Matched_URL': 'N/A',
-                    'Match_Tier': 'None'
-                }
-            
-            results.append(result_data)
-            
-            # Rate limiting
-            delay = random.uniform(1, 3)
-            print(f"⏳ Waiting {delay:.1f} seconds...")
-            time.sleep(delay)
+        # Parse SKU names for better matching - all up front, before any network I/O
+        parsed_skus = [parse_sku_name(name) for name in product_names]
         
-        # Save results to CSV
-        if results:
+        print(f"🎯 Processing {total_products} products with {MAX_WORKERS} workers...")
+        
+        if len(product_names):
             output_filename = f"trolley_enhanced_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            results_df = pd.DataFrame(results)
-            results_df.to_csv(output_filename, index=False, encoding='utf-8-sig')
+            tier_counts = Counter()
+            rows_written = 0
+            
+            # Stream rows to CSV as they complete so memory stays flat and a killed run keeps its results
+            with open(output_filename, 'w', encoding='utf-8-sig', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+                writer.writeheader()
+                
+                # Searches are I/O-bound: run them on a thread pool sharing one session and rate limit
+                with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                    for result_data in executor.map(
+                        _process_one,
+                        product_names,
+                        parsed_skus,
+                        range(1, len(product_names) + 1),
+                        repeat(total_products),
+                    ):
+                        writer.writerow(result_data)
+                        tier_counts[result_data['Match_Tier']] += 1
+                        rows_written += 1
+                        if rows_written % CSV_FLUSH_EVERY == 0:
+                            f.flush()
             
             print(f"\n{'='*60}")
             print(f"📊 SUMMARY REPORT")
             print('='*60)
-            print(f"✅ Total products processed: {len(results)}")
+            print(f"✅ Total products processed: {rows_written}")
             print(f"📁 Results saved to: {output_filename}")
             
             # Match tier statistics
-            tier_counts = results_df['Match_Tier'].value_counts()
             print(f"\n📈 Match Quality Distribution:")
-            for tier, count in tier_counts.items():
+            for tier, count in tier_counts.most_common():
                 print(f"   {tier}: {count} products")
             
             logging.info(f"Processing complete. Results saved to {output_filename}")
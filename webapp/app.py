@@ -1,9 +1,23 @@
+import csv
+import gzip
+import logging
 import os
+import re
 import secrets
+import tempfile
+import threading
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
-from flask import Flask, render_template, request, redirect, url_for, send_file, flash
+import openpyxl
+import orjson
+import pyarrow.parquet as pq
+from flask import Flask, Request, Response, render_template, request, redirect, url_for, send_file, flash, jsonify
+from flask.json.provider import DefaultJSONProvider
 import pandas as pd
 from werkzeug.utils import secure_filename
 
@@ -18,6 +32,8 @@ from trolley_interactive_enhanced_v2 import (
     parse_sku_name,
     get_search_results,
     find_best_match,
+    RESULT_FIELDS,
+    POOL_CONNECTIONS,
 )
 
 
@@ -26,16 +42,203 @@ UPLOAD_DIR = BASE_DIR / "uploads"
 RESULTS_DIR = BASE_DIR / "results"
 UPLOAD_DIR.mkdir(exist_ok=True)
 RESULTS_DIR.mkdir(exist_ok=True)
+ALLOWED_EXTENSIONS = (".xlsx", ".xls")
+# Upload job ids as minted by build_job_id(); they end up in file names
+_JOB_ID = re.compile(r"[0-9a-f]{16}")
+# Results CSVs are stored gzipped; level 4 keeps most of the ratio at a fraction of level 9's CPU
+CSV_GZIP_LEVEL = 4
+
+# Background batch runs, keyed by run id; finished runs are dropped after JOB_TTL_SECONDS.
+# This is per-process state, so serve the app from a single (multi-threaded) worker
+JOBS: dict[str, dict] = {}
+JOBS_LOCK = threading.Lock()
+JOB_TTL_SECONDS = 60 * 60
+# Parquet conversions started by /upload and still running, keyed by upload job id
+PREFETCHES: dict[str, threading.Thread] = {}
+PREFETCH_LOCK = threading.Lock()
+
+# Concurrent searches per batch; keep under the site's concurrency limit, and within
+# the shared session's connection pool so every worker reuses a kept-alive socket
+WORKERS = min(int(os.environ.get("TROLLEY_WORKERS", "12")), POOL_CONNECTIONS)
+# Rows kept in memory for the results page; the CSV always has every row
+PREVIEW_ROWS = 200
+# Rows of the selected column read from an upload's Parquet copy at a time
+CHUNK_ROWS = 10_000
+# One result row, laid out in CSV column order: a plain tuple for csv.writer, and
+# attribute access (r.SKU_Name) for the results template
+ResultRow = namedtuple("ResultRow", RESULT_FIELDS)
 
 
 def allowed_file(filename: str) -> bool:
-    return "." in filename and filename.rsplit(".", 1)[1].lower() in {"xlsx", "xls"}
+    return filename.lower().endswith(ALLOWED_EXTENSIONS)
 
 
 def build_job_id() -> str:
     return secrets.token_hex(8)
 
 
+def is_job_id(value) -> bool:
+    """Whether `value` has the shape of a build_job_id() id (and so is safe in a file name)"""
+    return isinstance(value, str) and _JOB_ID.fullmatch(value) is not None
+
+
+def parquet_path(job_id: str) -> Path:
+    """Path of an upload's Parquet copy; raises ValueError for anything but a job id"""
+    if not is_job_id(job_id):
+        raise ValueError(f"Invalid job id: {job_id!r}")
+    return UPLOAD_DIR / f"{job_id}.parquet"
+
+
+def preview_workbook(path: Path, n_samples: int = 3, max_scan_rows: int = 100):
+    """Column names, a few non-empty sample values per column and the row count of the first sheet.
+
+    Streams .xlsx files with openpyxl in read-only mode instead of loading the whole
+    sheet; legacy .xls files (which openpyxl can't read) still go through pandas.
+    When the scan stops before the end of the sheet, the row count comes from the
+    sheet's recorded dimension and is flagged as approximate (trailing styled but
+    empty rows count too).
+
+    :return: (columns, samples, row count or None, whether the count is approximate)
+    """
+    if path.suffix.lower() != ".xlsx":
+        df = pd.read_excel(path)
+        samples = [{"name": col, "samples": df[col].dropna().astype(str).head(n_samples).tolist()} for col in df.columns]
+        return df.columns.tolist(), samples, len(df), False
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        header = list(next(rows, ()))
+
+        # Read-only mode pads rows with None up to the sheet's recorded dimension (styled but
+        # empty cells count); track which columns actually hold something, like pandas does
+        used = [cell is not None for cell in header]
+        values = [[] for _ in header]
+        last_data_row = 0
+        exhausted = True
+        for row_number, row in enumerate(rows, 1):
+            if row_number > max_scan_rows or (row_number > n_samples and all(len(v) >= n_samples for v, u in zip(values, used) if u)):
+                exhausted = False
+                break
+            if len(row) > len(values):
+                used.extend([False] * (len(row) - len(used)))
+                values.extend([] for _ in range(len(row) - len(values)))
+            for i, cell in enumerate(row):
+                if cell is not None:
+                    used[i] = True
+                    last_data_row = row_number
+                    if len(values[i]) < n_samples:
+                        values[i].append(str(cell))
+
+        # Drop trailing columns that are empty in the header and every scanned row
+        width = max((i + 1 for i, u in enumerate(used) if u), default=0)
+
+        # Name columns the way pd.read_excel will in /process
+        columns, seen = [], Counter()
+        for i in range(width):
+            name = header[i] if i < len(header) and header[i] is not None else f"Unnamed: {i}"
+            columns.append(f"{name}.{seen[name]}" if seen[name] else name)
+            seen[name] += 1
+
+        samples = [{"name": col, "samples": v} for col, v in zip(columns, values)]
+        if exhausted:
+            return columns, samples, last_data_row, False
+        return columns, samples, ws.max_row - 1 if ws.max_row else None, True
+    finally:
+        wb.close()
+
+
+def convert_upload(file_path: Path, job_id: str) -> pd.DataFrame:
+    """Parse an uploaded workbook and save its Parquet copy, returning the parsed sheet.
+
+    The copy is written to a temporary name and renamed into place, so a concurrent
+    reader never sees a partial file.
+    """
+    target = parquet_path(job_id)
+    df = pd.read_excel(file_path)
+    tmp_path = target.with_name(f"{target.name}.{threading.get_ident()}.tmp")
+    # Arrow can't store object columns that mix types (e.g. numeric and text SKUs), so
+    # write them as text; blanks stay null. Names are only ever read back as strings.
+    table = df.copy()
+    for col in table.columns[table.dtypes == object]:
+        table[col] = table[col].where(table[col].isna(), table[col].astype(str))
+    try:
+        table.to_parquet(tmp_path, engine="pyarrow")
+        os.replace(tmp_path, target)
+    except Exception as e:
+        # e.g. non-text column names; the sheet just gets re-parsed next time
+        tmp_path.unlink(missing_ok=True)
+        logging.warning(f"Could not cache {file_path.name} as Parquet: {e}")
+    return df
+
+
+def _prefetch_upload(file_path: Path, job_id: str):
+    """Background target: convert an upload while the user is still picking a column"""
+    try:
+        convert_upload(file_path, job_id)
+    except Exception as e:
+        logging.warning(f"Background conversion of {file_path.name} failed: {e}")
+    finally:
+        with PREFETCH_LOCK:
+            PREFETCHES.pop(job_id, None)
+
+
+def start_prefetch(file_path: Path, job_id: str):
+    thread = threading.Thread(target=_prefetch_upload, args=(file_path, job_id), daemon=True)
+    with PREFETCH_LOCK:
+        PREFETCHES[job_id] = thread
+    thread.start()
+
+
+def wait_for_prefetch(job_id: str):
+    """Block until the upload's background conversion (if any) has finished"""
+    with PREFETCH_LOCK:
+        thread = PREFETCHES.get(job_id)
+    if thread is not None:
+        thread.join()
+
+
+def read_column_chunks(file_path: Path, job_id: str, column_name: str, limit: int | None = None):
+    """Return the selected column of an upload as an iterable of pandas Series chunks.
+
+    Reads the upload's Parquet copy, checking the column against its schema and
+    streaming only that column in batches of at most CHUNK_ROWS (or `limit`) rows.
+    Without a copy yet, the workbook is parsed (and cached) here instead.
+    Raises KeyError if the column doesn't exist, ValueError for a malformed job id.
+    """
+    source = parquet_path(job_id)
+    if not source.exists():
+        df = convert_upload(file_path, job_id)
+        if not source.exists():
+            if column_name not in df.columns:
+                raise KeyError(column_name)
+            return [df[column_name]]
+
+    parquet = pq.ParquetFile(source)
+    if column_name not in parquet.schema_arrow.names:
+        raise KeyError(column_name)
+    batch_size = min(CHUNK_ROWS, limit) if limit else CHUNK_ROWS
+    return (
+        batch.column(0).to_pandas()
+        for batch in parquet.iter_batches(batch_size=batch_size, columns=[column_name])
+    )
+
+
+def clean_names(chunks, limit: int | None = None):
+    """Yield arrays of non-empty SKU names per chunk, stopping after `limit` non-null cells"""
+    remaining = limit
+    for values in chunks:
+        values = values.dropna()
+        if remaining is not None:
+            values = values.head(remaining)
+            remaining -= len(values)
+        names = values.astype(str).str.strip()
+        yield names[(names != "") & (names.str.lower() != "nan")].to_numpy(dtype=object)
+        if remaining == 0:
+            break
+
+
 def safe_int(value, default=None):
     try:
         return int(value)
@@ -43,95 +246,201 @@ def safe_int(value, default=None):
         return default
 
 
-def process_dataframe(df: pd.DataFrame, column_name: str, limit: int | None = None, rate_limit: bool = False):
-    results: list[dict] = []
-
-    total_rows = len(df) if limit is None else min(len(df), limit)
-    series = df[column_name].dropna().head(total_rows)
-
-    for product_name in series:
-        name = str(product_name).strip()
-        if not name or name.lower() == "nan":
-            continue
-
-        brand, size, quantity = parse_sku_name(name)
-        search_results, search_url = get_search_results(name)
-
-        if not search_results:
-            results.append({
-                "SKU_Name": name,
-                "Parsed_Brand": brand,
-                "Parsed_Size": size,
-                "Parsed_Quantity": quantity,
-                "Search_URL": search_url,
-                "Match_Status": "No Results",
-                "Matched_Brand": "N/A",
-                "Matched_Description": "N/A",
-                "Matched_Size": "N/A",
-                "Matched_Quantity": "N/A",
-                "Matched_Price": "N/A",
-                "Matched_URL": "N/A",
-                "Match_Tier": "None",
-            })
-            continue
-
-        best_match = find_best_match(brand, size, quantity, search_results)
-
-        if best_match:
-            brand_match = brand.lower() in best_match.brand.lower() if brand else True
-            size_match = size.lower() in best_match.size.lower() if size else True
-            qty_match = str(quantity) == best_match.quantity if quantity else True
-
-            if brand_match and size_match and qty_match:
-                match_tier = "Tier 1 (Perfect)"
-            elif brand_match and size_match:
-                match_tier = "Tier 2 (Brand+Size)"
-            elif brand_match:
-                match_tier = "Tier 3 (Brand Only)"
-            else:
-                match_tier = "Tier 4 (Fallback)"
-
-            results.append({
-                "SKU_Name": name,
-                "Parsed_Brand": brand,
-                "Parsed_Size": size,
-                "Parsed_Quantity": quantity,
-                "Search_URL": search_url,
-                "Match_Status": "Matched",
-                "Matched_Brand": best_match.brand,
-                "Matched_Description": best_match.description,
-                "Matched_Size": best_match.size,
-                "Matched_Quantity": best_match.quantity,
-                "Matched_Price": best_match.price,
-                "Matched_URL": best_match.url,
-                "Match_Tier": match_tier,
-            })
-        else:
-            results.append({
-                "SKU_Name": name,
-                "Parsed_Brand": brand,
-                "Parsed_Size": size,
-                "Parsed_Quantity": quantity,
-                "Search_URL": search_url,
-                "Match_Status": "No Match",
-                "Matched_Brand": "N/A",
-                "Matched_Description": "N/A",
-                "Matched_Size": "N/A",
-                "Matched_Quantity": "N/A",
-                "Matched_Price": "N/A",
-                "Matched_URL": "N/A",
-                "Match_Tier": "None",
-            })
+_WS = re.compile(r"\s+")
+
+
+def normalize_name(name: str) -> str:
+    return _WS.sub(" ", name.lower()).strip()
+
+
+# Sheets repeat the same product across stores/regions. Parsing is pure, so it's memoized
+# for the process; searches are deduplicated per batch chunk in process_names and cached
+# (with expiry, and never when they fail) by get_search_results itself
+@lru_cache(maxsize=4096)
+def _cached_parse(name: str):
+    return parse_sku_name(name)
 
-    # Save CSV to project-level results folder
+
+def _build_row(name: str, search: tuple) -> ResultRow:
+    """Match one SKU name against its (search_results, search_url) and return its result row"""
+    brand, size, quantity = _cached_parse(name)
+    search_results, search_url = search
+
+    if not search_results:
+        return ResultRow(
+            SKU_Name=name,
+            Parsed_Brand=brand,
+            Parsed_Size=size,
+            Parsed_Quantity=quantity,
+            Search_URL=search_url,
+            Match_Status="No Results",
+            Matched_Brand="N/A",
+            Matched_Description="N/A",
+            Matched_Size="N/A",
+            Matched_Quantity="N/A",
+            Matched_Price="N/A",
+            Matched_URL="N/A",
+            Match_Tier="None",
+        )
+
+    best_match, match_tier = find_best_match(brand, size, quantity, search_results)
+
+    if best_match:
+        return ResultRow(
+            SKU_Name=name,
+            Parsed_Brand=brand,
+            Parsed_Size=size,
+            Parsed_Quantity=quantity,
+            Search_URL=search_url,
+            Match_Status="Matched",
+            Matched_Brand=best_match.brand,
+            Matched_Description=best_match.description,
+            Matched_Size=best_match.size,
+            Matched_Quantity=best_match.quantity,
+            Matched_Price=best_match.price,
+            Matched_URL=best_match.url,
+            Match_Tier=match_tier,
+        )
+
+    return ResultRow(
+        SKU_Name=name,
+        Parsed_Brand=brand,
+        Parsed_Size=size,
+        Parsed_Quantity=quantity,
+        Search_URL=search_url,
+        Match_Status="No Match",
+        Matched_Brand="N/A",
+        Matched_Description="N/A",
+        Matched_Size="N/A",
+        Matched_Quantity="N/A",
+        Matched_Price="N/A",
+        Matched_URL="N/A",
+        Match_Tier="None",
+    )
+
+
+def process_names(name_chunks, on_progress=None):
+    """Search every name, chunk by chunk, streaming rows to a results CSV.
+
+    :param on_progress: Optional callable given the running row count after each row
+    :return: (first PREVIEW_ROWS rows, CSV path, rows processed, tier counts)
+    """
+    # Save CSV to project-level results folder, one row at a time as results arrive; it's
+    # gzipped as it's written so /download can send it compressed without re-encoding
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_path = RESULTS_DIR / f"trolley_results_{timestamp}.csv"
-    pd.DataFrame(results).to_csv(output_path, index=False, encoding="utf-8-sig")
-    return results, str(output_path)
+    output_path = RESULTS_DIR / f"trolley_results_{timestamp}.csv.gz"
+    preview: list[ResultRow] = []
+    tier_counts: Counter = Counter()
+    processed = 0
+
+    with gzip.open(output_path, "wt", encoding="utf-8-sig", newline="", compresslevel=CSV_GZIP_LEVEL) as fh:
+        writer = csv.writer(fh)
+        writer.writerow(RESULT_FIELDS)
+
+        # Searches are network-bound; the shared rate limiter in get_search_results keeps the pool polite
+        with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+            for names in name_chunks:
+                chunk_start = processed + 1
+                # One search per distinct name in the chunk: duplicates share the in-flight future
+                # rather than each missing the cache while the first fetch is still running.
+                # The normalized key only groups them; the search uses the first spelling seen
+                keys = [normalize_name(name) for name in names]
+                searches = {}
+                for name, key in zip(names, keys):
+                    if key not in searches:
+                        searches[key] = executor.submit(get_search_results, name)
+
+                # Matching is cheap local work, done here in input order as searches complete
+                for name, key in zip(names, keys):
+                    row = _build_row(name, searches[key].result())
+                    writer.writerow(row)
+                    tier_counts[row.Match_Tier] += 1
+                    if len(preview) < PREVIEW_ROWS:
+                        preview.append(row)
+                    processed += 1
+                    if on_progress is not None:
+                        on_progress(processed)
+                logging.info(f"Processed rows {chunk_start}-{processed} -> {output_path.name}")
+
+    return preview, str(output_path), processed, dict(tier_counts.most_common())
+
+
+def start_job(file_path: Path, job_id: str, column_name: str, limit: int, **info) -> str:
+    """Run a batch on a background thread and return its run id for /status polling.
+
+    The upload is read on that thread too, so the request never parses the workbook.
+    `info` (filename, ...) is kept on the job for the results page.
+    """
+    run_id = build_job_id()
+    now = time.monotonic()
+    with JOBS_LOCK:
+        # Forget finished runs nobody has looked at for a while
+        for old_id in [k for k, job in JOBS.items() if job["done"] and now - job["finished"] > JOB_TTL_SECONDS]:
+            del JOBS[old_id]
+        JOBS[run_id] = {
+            **info, "job_id": job_id, "column_name": column_name,
+            "done": False, "processed": 0, "total": limit, "error": None,
+        }
+
+    threading.Thread(target=_run_job, args=(run_id, file_path, job_id, column_name, limit), daemon=True).start()
+    return run_id
+
+
+def _run_job(run_id: str, file_path: Path, job_id: str, column_name: str, limit: int):
+    def on_progress(processed: int):
+        with JOBS_LOCK:
+            JOBS[run_id]["processed"] = processed
+
+    # Reuse the Parquet copy /upload started rather than parsing the workbook a second time
+    wait_for_prefetch(job_id)
+    try:
+        name_chunks = read_column_chunks(file_path, job_id, column_name, limit)
+    except KeyError:
+        update = {"error": "Selected column not found in file."}
+    except Exception as e:
+        update = {"error": f"Failed to read Excel file: {e}"}
+    else:
+        try:
+            results, csv_path, processed, tier_counts = process_names(clean_names(name_chunks, limit), on_progress)
+            update = {"results": results, "csv_path": csv_path, "processed": processed, "tier_counts": tier_counts}
+        except Exception as e:
+            logging.exception(f"Job {run_id} failed")
+            update = {"error": f"Processing failed: {e}"}
+
+    with JOBS_LOCK:
+        JOBS[run_id].update(update, done=True, finished=time.monotonic())
+
+
+class UploadRequest(Request):
+    """Request whose multipart file parts spool to UPLOAD_DIR instead of the system temp dir"""
+
+    # Parts larger than this go to disk while the upload is still being received
+    spool_max_size = 1024 * 1024
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # /tmp is often RAM-backed (tmpfs) in containers; the uploads volume is real disk
+        return tempfile.SpooledTemporaryFile(max_size=self.spool_max_size, mode="rb+", dir=UPLOAD_DIR)
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson; types orjson can't encode fall back to Flask's default().
+
+    Keys are sorted like Flask's provider, but unlike it non-ASCII text is written as UTF-8
+    rather than \\u escapes (ensure_ascii is ignored), and datetimes come out as ISO 8601
+    instead of HTTP dates.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 
 def create_app():
     app = Flask(__name__, template_folder=str(APP_DIR / "templates"))
+    app.request_class = UploadRequest
+    app.json = ORJSONProvider(app)
     app.config["SECRET_KEY"] = os.environ.get("FLASK_SECRET_KEY", secrets.token_hex(16))
     app.config["MAX_CONTENT_LENGTH"] = 50 * 1024 * 1024
 
@@ -159,24 +468,25 @@ def create_app():
         dest_path = UPLOAD_DIR / f"{job_id}__{fname}"
         file.save(dest_path)
 
+        # Only a preview is needed here; the full read is deferred to /process
         try:
-            df = pd.read_excel(dest_path)
+            columns, samples, total_rows, rows_approximate = preview_workbook(dest_path)
         except Exception as e:
             flash(f"Failed to read Excel file: {e}", "error")
             return redirect(url_for("index"))
 
-        samples = []
-        for col in df.columns:
-            vals = df[col].dropna().astype(str).head(3).tolist()
-            samples.append({"name": col, "samples": vals})
+        # Build the Parquet copy while the user picks a column, so the run can skip the workbook
+        start_prefetch(dest_path, job_id)
 
         return render_template(
             "select_column.html",
             job_id=job_id,
+            upload_path=dest_path.name,
             filename=fname,
-            columns=df.columns.tolist(),
+            columns=columns,
             samples=samples,
-            total_rows=len(df),
+            total_rows=total_rows,
+            rows_approximate=rows_approximate,
         )
 
     @app.route("/process", methods=["POST"]) 
@@ -186,21 +496,19 @@ def create_app():
         limit_mode = request.form.get("limit_mode", "5")
         custom_limit = safe_int(request.form.get("custom_limit"), None)
 
-        files = list(UPLOAD_DIR.glob(f"{job_id}__*"))
-        if not files:
+        # The form carries the saved file's name, so no directory scan is needed; it must
+        # sit directly in UPLOAD_DIR and belong to this job. The job id names files too,
+        # so it has to look like one build_job_id() made
+        upload_name = request.form.get("upload_path", "")
+        file_path = (UPLOAD_DIR / upload_name).resolve()
+        if (
+            not is_job_id(job_id)
+            or not upload_name.startswith(f"{job_id}__")
+            or file_path.parent != UPLOAD_DIR
+            or not file_path.is_file()
+        ):
             flash("Upload not found. Please upload the file again.", "error")
             return redirect(url_for("index"))
-        file_path = files[0]
-
-        try:
-            df = pd.read_excel(file_path)
-        except Exception as e:
-            flash(f"Failed to read Excel file: {e}", "error")
-            return redirect(url_for("index"))
-
-        if column_name not in df.columns:
-            flash("Selected column not found in file.", "error")
-            return redirect(url_for("index"))
 
         limit_map = {"5": 5, "10": 10, "50": 50, "all": None, "custom": custom_limit}
         limit = limit_map.get(limit_mode, 5)
@@ -209,22 +517,51 @@ def create_app():
             return redirect(url_for("index"))
 
         if limit is None:
-            limit = min(100, len(df))
+            limit = 100
 
-        results, csv_path = process_dataframe(df, column_name, limit=limit, rate_limit=False)
+        # Read and scrape on a background thread; the browser polls /status and moves on to /results
+        filename = os.path.basename(file_path)
+        run_id = start_job(file_path, job_id, column_name, limit, filename=filename)
+        return render_template(
+            "pending.html",
+            run_id=run_id,
+            filename=filename,
+            column_name=column_name,
+            total=limit,
+        )
+
+    @app.route("/status/<run_id>")
+    def status(run_id: str):
+        with JOBS_LOCK:
+            job = JOBS.get(run_id)
+            if job is None:
+                return jsonify({"error": "Unknown job. Please start again."}), 404
+            csv_path = job.get("csv_path")
+            return jsonify({
+                "done": job["done"],
+                "processed": job["processed"],
+                "total": job["total"],
+                "csv_path": os.path.basename(csv_path) if csv_path else None,
+                "error": job["error"],
+            })
 
-        df_results = pd.DataFrame(results)
-        tier_counts = df_results["Match_Tier"].value_counts().to_dict() if not df_results.empty else {}
+    @app.route("/results/<run_id>")
+    def results(run_id: str):
+        with JOBS_LOCK:
+            job = JOBS.get(run_id)
+        if job is None or not job["done"] or job["error"]:
+            flash(job["error"] if job and job["error"] else "Results not available. Please run the file again.", "error")
+            return redirect(url_for("index"))
 
         return render_template(
             "results.html",
-            job_id=job_id,
-            filename=os.path.basename(file_path),
-            column_name=column_name,
-            total_processed=len(results),
-            results=results,
-            csv_path=os.path.basename(csv_path),
-            tier_counts=tier_counts,
+            job_id=job["job_id"],
+            filename=job["filename"],
+            column_name=job["column_name"],
+            total_processed=job["processed"],
+            results=job["results"],
+            csv_path=os.path.basename(job["csv_path"]),
+            tier_counts=job["tier_counts"],
         )
 
     @app.route("/download/<path:csv_name>")
@@ -233,7 +570,26 @@ def create_app():
         if not csv_path.exists():
             flash("File not found.", "error")
             return redirect(url_for("index"))
-        return send_file(csv_path, as_attachment=True, download_name=csv_path.name)
+        if csv_path.suffix != ".gz":
+            return send_file(csv_path, as_attachment=True, download_name=csv_path.name)
+
+        # Gzipped results go out as-is for the browser to decompress, unless the client
+        # can't take gzip or asks for ?raw=1, in which case they're inflated on the fly
+        download_name = csv_path.name.removesuffix(".gz")
+        if request.args.get("raw") != "1" and "gzip" in request.accept_encodings:
+            response = send_file(csv_path, mimetype="text/csv", as_attachment=True, download_name=download_name)
+            response.headers["Content-Encoding"] = "gzip"
+            response.vary.add("Accept-Encoding")
+            return response
+
+        def inflate():
+            with gzip.open(csv_path, "rb") as fh:
+                while chunk := fh.read(64 * 1024):
+                    yield chunk
+
+        response = Response(inflate(), mimetype="text/csv")
+        response.headers.set("Content-Disposition", "attachment", filename=download_name)
+        return response
 
     return app
 